@@ -0,0 +1,331 @@
+import csv
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from multiprocessing import Pool
+
+import pandas as pd
+import phonenumbers
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from flask import Flask, render_template, request, send_file, session
+
+app = Flask(__name__)
+app.secret_key = 'webscrapper-dev-key'
+app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB upload limit
+
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+# Columns kept by the "filter columns" cleaning option.
+ALLOWED_COLUMNS = ['First Name', 'Last Name', 'Title', 'Company', 'Email',
+                   'Phone Number', 'Location']
+
+# String values that stand in for "no data" after pandas round-trips.
+_NULL_TOKENS = frozenset(('nan', 'NaN', 'None', '<NA>', ''))
+
+# Deletes phone punctuation in a single C-level pass.
+_PHONE_STRIP = str.maketrans('', '', ' -()+')
+
+# Columns matching this look like phone number columns.
+_PHONE_COL_RE = re.compile(r'phone|mobile|cell|tel', re.IGNORECASE)
+
+# The E.164 grammar; strings already in this shape need no parsing.
+_E164_RE = re.compile(r'^\+[1-9]\d{1,14}$')
+
+# Unique-phone count above which normalisation fans out to a process
+# pool; below it the fork/pickle overhead outweighs the parse cost.
+_PARALLEL_MIN_UNIQUES = 5000
+
+# Rows per record batch when the cleaned frame has to be rebuilt from
+# Parquet; bounds peak memory at one batch plus the cleaned parts.
+_CHUNK_ROWS = 50_000
+
+# Recently parsed frames keyed by session id, so toggling options and
+# re-cleaning skips the disk read. LRU-bounded; Parquet remains the
+# fallback when an entry has been evicted.
+_DF_CACHE = OrderedDict()
+_DF_CACHE_MAX = 16
+
+
+def cleanup_old_files():
+    """Delete uploaded files older than an hour."""
+    current_time = time.time()
+    # scandir serves is_file() and stat() from one directory read instead
+    # of a join/isfile/getctime syscall trio per entry.
+    with os.scandir(app.config['UPLOAD_FOLDER']) as it:
+        for entry in it:
+            if entry.is_file() and current_time - entry.stat().st_ctime > 3600:
+                os.remove(entry.path)
+
+
+def normalize_phone_number(phone, country='US'):
+    """Normalise a phone number to E.164, falling back to the raw value."""
+    if phone is None or pd.isna(phone):
+        return ''
+    phone_str = str(phone).strip()
+    if phone_str in _NULL_TOKENS:
+        return ''
+    had_plus = phone_str.startswith('+')
+    phone_str_clean = phone_str.translate(_PHONE_STRIP)
+    if had_plus:
+        phone_str_clean = '+' + phone_str_clean
+    # Already E.164: skip the parse/validate/format round-trip entirely.
+    if _E164_RE.match(phone_str_clean):
+        return phone_str_clean
+    try:
+        parsed = phonenumbers.parse(phone_str_clean, country)
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    except phonenumbers.NumberParseException:
+        pass
+    return phone_str
+
+
+def get_phone_columns(df):
+    """Return the columns that look like phone number columns."""
+    return [col for col in df.columns if _PHONE_COL_RE.search(col)]
+
+
+def create_phone_number_column(df):
+    """Add a 'Phone Number' column holding the first non-empty phone value."""
+    source_cols = [col for col in get_phone_columns(df) if col != 'Phone Number']
+    if not source_cols:
+        return df
+    # Vectorized coalesce: mask sentinel strings to NA once, then take the
+    # first valid value per row with bfill. One C-level pass instead of
+    # iterrows with a per-cell .at write.
+    sub = df[source_cols].astype('string').apply(lambda s: s.str.strip())
+    sub = sub.mask(sub.isin(_NULL_TOKENS))
+    first_valid = sub.bfill(axis=1).iloc[:, 0]
+    if 'Phone Number' in df.columns:
+        # Rows with no source value keep whatever the column already held.
+        first_valid = first_valid.fillna(df['Phone Number'].astype('string'))
+    df['Phone Number'] = first_valid.fillna('').to_numpy()
+    return df
+
+
+def create_location_column(df):
+    """Add a 'Location' column joining City/State/Country when present."""
+    location_cols = [col for col in ['City', 'State', 'Country'] if col in df.columns]
+    if not location_cols:
+        return df
+    # Mask sentinels to NA and drop them after stacking, so one
+    # groupby-join per row replaces the iterrows loop with per-cell .at
+    # writes. The dropna is explicit because stack() stops dropping NAs
+    # by default in pandas 3.
+    sub = df[location_cols].astype('string').apply(lambda s: s.str.strip())
+    sub = sub.mask(sub.isin(_NULL_TOKENS))
+    joined = sub.stack().dropna().groupby(level=0).agg(', '.join)
+    df['Location'] = joined.reindex(df.index).fillna('').to_numpy()
+    return df
+
+
+def _clean_chunk(df, cleaning_options):
+    """Apply the row-local cleaning options to one chunk of rows.
+
+    Every option here decides each row from that row alone, so the same
+    function serves whole frames and record batches streamed from
+    Parquet; only deduplication needs to see all rows at once and lives
+    in _finalize_clean.
+
+    The caller's frame is not modified, but no deep copy is taken: every
+    branch either assigns whole columns or filters to a new frame, so a
+    shallow copy is enough and peak memory stays at one frame.
+    """
+    df_cleaned = df.copy(deep=False)
+
+    if 'trim_whitespace' in cleaning_options:
+        # Arrow-backed columns report as 'string', not 'object'; strip each
+        # in one kernel with no astype round-trip. Stripping can expose
+        # padded null tokens (' nan ') that the ingest scrub missed, so
+        # blank those in the same assignment.
+        str_cols = df_cleaned.select_dtypes(include=['object', 'string']).columns
+        stripped = df_cleaned[str_cols].apply(lambda s: s.str.strip())
+        df_cleaned[str_cols] = stripped.mask(stripped.isin(_NULL_TOKENS), '')
+
+    if ('drop_missing_names' in cleaning_options
+            and 'First Name' in df_cleaned.columns and 'Last Name' in df_cleaned.columns):
+        # Strip each name column once and filter with a single mask; the
+        # empty-string test subsumes the old dropna. (DataFrame.query was
+        # tried here, but pandas evaluates in/not-in terms in Python
+        # space whatever the engine, so it only added parse overhead.)
+        first_names = df_cleaned['First Name'].astype(str).str.strip()
+        last_names = df_cleaned['Last Name'].astype(str).str.strip()
+        df_cleaned = df_cleaned[~first_names.isin(['', 'nan'])
+                                & ~last_names.isin(['', 'nan'])]
+
+    if 'title_case' in cleaning_options and 'Title' in df_cleaned.columns:
+        df_cleaned['Title'] = df_cleaned['Title'].str.title()
+
+    if 'lowercase_emails' in cleaning_options and 'Email' in df_cleaned.columns:
+        df_cleaned['Email'] = df_cleaned['Email'].str.lower()
+
+    if 'normalize_phones' in cleaning_options and 'Phone Number' in df_cleaned.columns:
+        # Contact exports repeat numbers heavily; parse each distinct value
+        # once and broadcast with map instead of calling phonenumbers per row.
+        s = df_cleaned['Phone Number'].astype(str)
+        uniq = s.unique()
+        if len(uniq) > _PARALLEL_MIN_UNIQUES:
+            # phonenumbers is pure Python and per-value independent, so
+            # large unique sets parse in parallel across cores.
+            with Pool(os.cpu_count()) as pool:
+                normalized = pool.map(
+                    normalize_phone_number, uniq,
+                    chunksize=max(1, len(uniq) // (os.cpu_count() * 4)))
+            mapping = dict(zip(uniq, normalized))
+        else:
+            mapping = {value: normalize_phone_number(value) for value in uniq}
+        df_cleaned['Phone Number'] = s.map(mapping)
+
+    return df_cleaned
+
+
+def _finalize_clean(df_cleaned, cleaning_options):
+    """Apply the global cleaning steps: deduplication and column filtering."""
+    # Both dedups assemble into one keep-mask and one filter: a row stays
+    # when its email is first-seen-or-empty and its phone is
+    # first-seen-or-empty, instead of two mask/split/concat/sort rounds.
+    remove_email = ('remove_email_duplicates' in cleaning_options
+                    and 'Email' in df_cleaned.columns)
+    remove_phone = ('remove_phone_duplicates' in cleaning_options
+                    and 'Phone Number' in df_cleaned.columns)
+    if remove_email or remove_phone:
+        keep = pd.Series(True, index=df_cleaned.index)
+        # Categorical keys make duplicated() hash small integer codes
+        # instead of arbitrary-length strings.
+        if remove_email:
+            emails = df_cleaned['Email'].astype(str).str.strip().astype('category')
+            keep &= ~emails.duplicated() | emails.eq('')
+        if remove_phone:
+            phones = df_cleaned['Phone Number'].astype(str).str.strip().astype('category')
+            keep &= ~phones.duplicated() | phones.eq('')
+        df_cleaned = df_cleaned[keep]
+
+    if 'filter_columns' in cleaning_options:
+        df_cleaned = df_cleaned[[col for col in ALLOWED_COLUMNS if col in df_cleaned.columns]]
+
+    return df_cleaned
+
+
+def clean_dataframe(df, cleaning_options):
+    """Apply the selected cleaning options and return the cleaned frame."""
+    return _finalize_clean(_clean_chunk(df, cleaning_options), cleaning_options)
+
+
+@app.route('/', methods=['GET', 'POST'])
+def index():
+    cleanup_old_files()
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if file is None or file.filename == '':
+            return render_template('index.html', error='Please select a CSV file to upload.')
+        if not file.filename.lower().endswith('.csv'):
+            return render_template('index.html', error='Only CSV files are supported.')
+
+        session_id = str(uuid.uuid4())
+        session['session_id'] = session_id
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], session_id + '.csv')
+        file.save(filepath)
+
+        try:
+            # Arrow's SIMD tokenizer with every column pinned to string at
+            # the reader, so numeric-looking text (+-prefixed phones,
+            # zero-padded zips) round-trips exactly instead of being
+            # type-inferred and re-cast. The arrow-backed strings are far
+            # smaller than object dtype and .str ops run in Arrow C++
+            # downstream.
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                header = next(csv.reader(f), [])
+            table = pacsv.read_csv(
+                filepath,
+                convert_options=pacsv.ConvertOptions(
+                    column_types={name: pa.string() for name in header}))
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        except (ValueError, UnicodeDecodeError, csv.Error):
+            return render_template('index.html',
+                                   error='Could not read the CSV file. Please check its encoding and format.')
+        # Fill parse-time NA, then blank every literal null token in one
+        # vectorized isin scan rather than chained replaces.
+        df = df.fillna('')
+        df = df.where(~df.isin(_NULL_TOKENS), '')
+
+        df = create_phone_number_column(df)
+        df = create_location_column(df)
+
+        # Persist the parsed frame (with derived columns) as Parquet: no
+        # re-tokenising on /clean and the arrow string dtype survives the
+        # round-trip, unlike a CSV rewrite.
+        parquet_path = os.path.join(app.config['UPLOAD_FOLDER'], session_id + '.parquet')
+        df.to_parquet(parquet_path, engine='pyarrow', compression='snappy')
+
+        _DF_CACHE[session_id] = df
+        _DF_CACHE.move_to_end(session_id)
+        while len(_DF_CACHE) > _DF_CACHE_MAX:
+            _DF_CACHE.popitem(last=False)
+
+        session['current_file'] = parquet_path
+        preview = df.head(10).values.tolist()
+        return render_template('index.html', columns=list(df.columns), preview=preview,
+                               row_count=len(df))
+
+    return render_template('index.html')
+
+
+@app.route('/clean', methods=['POST'])
+def clean_data():
+    filepath = session.get('current_file')
+    if not filepath or not os.path.exists(filepath):
+        return render_template('index.html', error='Please upload a CSV file first.')
+
+    cleaning_options = request.form.getlist('cleaning_options')
+    # The download is still served as CSV, whatever the stored format.
+    cleaned_filepath = os.path.join(
+        app.config['UPLOAD_FOLDER'],
+        'cleaned_' + os.path.splitext(os.path.basename(filepath))[0] + '.csv')
+
+    # The frame was normalised at upload; take it straight from the
+    # in-process cache when possible. Parquet preserves it exactly on the
+    # fallback path, so no post-read scrubbing is needed either way.
+    session_id = session.get('session_id')
+    df = _DF_CACHE.get(session_id)
+    if df is None:
+        # The full frame never exists on this path: stream the Parquet
+        # file in record batches, clean each batch (row-local options
+        # only), and concatenate the cleaned — typically much smaller —
+        # parts before the global dedup pass. Peak memory is one batch
+        # plus the cleaned output instead of the whole upload.
+        cleaned_parts = [
+            _clean_chunk(batch.to_pandas(types_mapper=pd.ArrowDtype), cleaning_options)
+            for batch in pq.ParquetFile(filepath).iter_batches(batch_size=_CHUNK_ROWS)
+        ]
+        df_cleaned = _finalize_clean(
+            pd.concat(cleaned_parts, ignore_index=True), cleaning_options)
+    else:
+        _DF_CACHE.move_to_end(session_id)
+        df_cleaned = clean_dataframe(df, cleaning_options)
+    # pyarrow's multi-threaded C++ CSV writer is several times faster than
+    # DataFrame.to_csv for the final materialisation.
+    pacsv.write_csv(pa.Table.from_pandas(df_cleaned, preserve_index=False),
+                    cleaned_filepath)
+
+    session['cleaned_file'] = cleaned_filepath
+    preview = df_cleaned.head(10).values.tolist()
+    return render_template('index.html', columns=list(df_cleaned.columns), preview=preview,
+                           download_ready=True)
+
+
+@app.route('/download')
+def download_csv():
+    cleaned_filepath = session.get('cleaned_file')
+    if not cleaned_filepath or not os.path.exists(cleaned_filepath):
+        return render_template('index.html', error='No cleaned file available for download.')
+    return send_file(cleaned_filepath, as_attachment=True,
+                     download_name='cleaned_data.csv', mimetype='text/csv')
+
+
+if __name__ == '__main__':
+    app.run(debug=True)
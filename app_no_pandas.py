@@ -0,0 +1,539 @@
+import csv
+import functools
+import itertools
+import os
+import pickle
+import queue
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+import phonenumbers
+from flask import Flask, render_template, request, send_file, session
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional; the stdlib csv path always works
+    pa = None
+    pacsv = None
+
+app = Flask(__name__)
+app.secret_key = 'webscrapper-dev-key'
+app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB upload limit
+
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+# Columns kept by the "filter columns" cleaning option.
+ALLOWED_COLUMNS = ['First Name', 'Last Name', 'Title', 'Company', 'Email',
+                   'Phone Number', 'Location']
+
+# Cell values treated as empty, hashed once instead of rebuilding a list
+# literal per cell. The _LC variant is for keys already lowercased.
+EMPTY_SENTINELS = frozenset(('', 'None', 'NULL', 'nan'))
+EMPTY_SENTINELS_LC = frozenset(('', 'none', 'null', 'nan'))
+
+# Deletes phone punctuation in a single C-level pass.
+_PHONE_STRIP = str.maketrans('', '', ' -()+')
+
+# Bound once; csv.reader cells are always str, so no cast is needed.
+_strip = str.strip
+
+# Headers matching this look like phone number columns.
+_PHONE_COL_RE = re.compile(r'phone|mobile|cell|tel', re.IGNORECASE)
+
+# Row count above which the row-local cleaning steps fan out to worker
+# processes; below it the fork/pickle overhead is not worth paying.
+PARALLEL_MIN_ROWS = 50_000
+_PARALLEL_CHUNK_ROWS = 10_000
+
+# Background writer for /clean so the preview renders as soon as the
+# first rows are ready. Only suitable under a threaded WSGI server (the
+# Flask dev server and most production setups are). Futures are keyed by
+# session id, one per session: re-cleaning joins or cancels the previous
+# writer before submitting the next.
+_clean_executor = ThreadPoolExecutor(max_workers=2)
+_clean_futures = {}
+
+# Per-worker transform plan, set once by the pool initializer so it is
+# not re-pickled with every chunk.
+_worker_plan = None
+
+
+def _init_worker(plan):
+    global _worker_plan
+    _worker_plan = plan
+
+
+def _op_pad(row, width):
+    delta = width - len(row)
+    if delta > 0:
+        row += [''] * delta
+    return row
+
+
+def _op_trim(row):
+    row[:] = list(map(_strip, row))
+    return row
+
+
+def _op_drop_missing_names(row, first_idx, last_idx):
+    if row[first_idx].strip() in EMPTY_SENTINELS or row[last_idx].strip() in EMPTY_SENTINELS:
+        return None
+    return row
+
+
+def _op_title_case(row, title_idx):
+    value = row[title_idx].strip()
+    if value not in EMPTY_SENTINELS:
+        row[title_idx] = value.title()
+    return row
+
+
+def _op_lower_email(row, email_idx):
+    value = row[email_idx].strip()
+    if value not in EMPTY_SENTINELS:
+        row[email_idx] = value.lower()
+    return row
+
+
+def _op_normalize_phone(row, phone_idx):
+    row[phone_idx] = normalize_phone_number(row[phone_idx])
+    return row
+
+
+def _compile_plan(cleaning_options, col_index, width):
+    """Compile the selected options into a list of row-local operations.
+
+    Only enabled options get an entry and only their column indices are
+    resolved, so disabled branches cost nothing per row. Built from
+    module-level functions via functools.partial so the plan pickles
+    cleanly for the worker pool. Each op returns the row, or None to drop
+    it.
+    """
+    plan = [functools.partial(_op_pad, width=width)]
+    if 'trim_whitespace' in cleaning_options:
+        plan.append(_op_trim)
+    if 'drop_missing_names' in cleaning_options:
+        first_idx = col_index.get('First Name')
+        last_idx = col_index.get('Last Name')
+        if first_idx is not None and last_idx is not None:
+            plan.append(functools.partial(_op_drop_missing_names,
+                                          first_idx=first_idx, last_idx=last_idx))
+    if 'title_case' in cleaning_options and col_index.get('Title') is not None:
+        plan.append(functools.partial(_op_title_case, title_idx=col_index['Title']))
+    if 'lowercase_emails' in cleaning_options and col_index.get('Email') is not None:
+        plan.append(functools.partial(_op_lower_email, email_idx=col_index['Email']))
+    if 'normalize_phones' in cleaning_options and col_index.get('Phone Number') is not None:
+        plan.append(functools.partial(_op_normalize_phone,
+                                      phone_idx=col_index['Phone Number']))
+    return plan
+
+
+def _transform_row(row, plan):
+    """Run the compiled row-local plan; returns None when the row drops."""
+    for op in plan:
+        row = op(row)
+        if row is None:
+            return None
+    return row
+
+
+def _clean_chunk(chunk):
+    """Transform a chunk of rows in a worker process."""
+    plan = _worker_plan
+    return [out for out in (_transform_row(row, plan) for row in chunk)
+            if out is not None]
+
+
+def _chunk_iter(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def cleanup_old_files():
+    """Delete uploaded files older than an hour."""
+    current_time = time.time()
+    # scandir serves is_file() and stat() from one directory read instead
+    # of a join/isfile/getctime syscall trio per entry.
+    with os.scandir(app.config['UPLOAD_FOLDER']) as it:
+        for entry in it:
+            if entry.is_file() and current_time - entry.stat().st_ctime > 3600:
+                os.remove(entry.path)
+
+
+def _iter_rows(f, reader):
+    """Yield the remaining rows of ``reader``, closing ``f`` when done."""
+    try:
+        for row in reader:
+            yield row
+    finally:
+        f.close()
+
+
+def read_csv_file(filepath):
+    """Read a CSV file and return ``(headers, rows)``.
+
+    ``rows`` is a generator that yields one row at a time, so the file is
+    never materialised in memory as a whole. Comma-delimited UTF-8 (the
+    overwhelmingly common case) is read directly; only when that fails or
+    the header looks wrong does it fall back to trying other encodings
+    with csv.Sniffer. When pyarrow is installed its SIMD tokenizer is
+    used for that common case instead of the stdlib csv module.
+    """
+    if pacsv is not None:
+        try:
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                header = next(csv.reader(f), [])
+            if len(header) >= 2:
+                # Pin every column to string so values round-trip exactly
+                # as they appear in the file, like csv.reader gives us.
+                table = pacsv.read_csv(
+                    filepath,
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={name: pa.string() for name in header}))
+                columns = [chunked.to_pylist() for chunked in table.columns]
+                rows = ([('' if v is None else v) for v in vals]
+                        for vals in zip(*columns))
+                return list(table.column_names), rows
+        except (UnicodeDecodeError, csv.Error, pa.ArrowInvalid):
+            pass
+
+    try:
+        f = open(filepath, 'r', encoding='utf-8', newline='')
+        try:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+        except (UnicodeDecodeError, csv.Error):
+            f.close()
+        else:
+            if len(headers) >= 2:
+                return headers, _iter_rows(f, reader)
+            f.close()
+    except OSError:
+        raise ValueError('Could not read the CSV file. Please check its encoding and format.')
+
+    return _read_csv_fallback(filepath)
+
+
+def _read_csv_fallback(filepath, encodings=('utf-8', 'latin-1', 'cp1252', 'iso-8859-1')):
+    """Try ``encodings`` in turn with csv.Sniffer and return ``(headers, rows)``."""
+    for encoding in encodings:
+        try:
+            f = open(filepath, 'r', encoding=encoding, newline='')
+            sample = f.read(1024)
+            f.seek(0)
+            dialect = csv.Sniffer().sniff(sample)
+            reader = csv.reader(f, dialect)
+            headers = next(reader, [])
+        except (UnicodeDecodeError, csv.Error):
+            f.close()
+            continue
+        return headers, _iter_rows(f, reader)
+    raise ValueError('Could not read the CSV file. Please check its encoding and format.')
+
+
+@functools.lru_cache(maxsize=200_000)
+def _normalize_cached(phone_clean, country):
+    """Parse, validate and format one cleaned phone string, memoised.
+
+    phonenumbers calls are deterministic and comparatively expensive, and
+    contact exports repeat the same numbers a lot, so repeated values cost
+    one dict lookup. Returns None when the number cannot be normalised.
+    """
+    try:
+        parsed = phonenumbers.parse(phone_clean, country)
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    except phonenumbers.NumberParseException:
+        pass
+    return None
+
+
+def normalize_phone_number(phone, country='US'):
+    """Normalise a phone number to E.164, falling back to the raw value."""
+    if phone is None:
+        return ''
+    phone_str = str(phone).strip()
+    if phone_str in EMPTY_SENTINELS:
+        return ''
+    had_plus = phone_str.startswith('+')
+    phone_clean = phone_str.translate(_PHONE_STRIP)
+    if had_plus:
+        phone_clean = '+' + phone_clean
+    # Nothing this short can parse as a valid number, so skip the
+    # phonenumbers round-trip (and its exception path) outright.
+    if len(phone_clean) < 7:
+        return phone_str
+    normalized = _normalize_cached(phone_clean, country)
+    return normalized if normalized is not None else phone_str
+
+
+def get_phone_columns(headers):
+    """Return the headers that look like phone number columns."""
+    return [col for col in headers if _PHONE_COL_RE.search(col)]
+
+
+def create_phone_number_column(headers, data):
+    """Add a 'Phone Number' column holding the first non-empty phone value."""
+    phone_columns = get_phone_columns(headers)
+    if not phone_columns:
+        return
+    if 'Phone Number' not in headers:
+        headers.append('Phone Number')
+        for row in data:
+            row.append('')
+    # One O(H) pass instead of headers.index() per cell per row.
+    idx = {h: i for i, h in enumerate(headers)}
+    phone_idx = idx['Phone Number']
+    source_indices = [idx[col] for col in phone_columns if col != 'Phone Number']
+    for row in data:
+        for col_idx in source_indices:
+            value = row[col_idx].strip()
+            if value not in EMPTY_SENTINELS:
+                row[phone_idx] = value
+                break
+
+
+def create_location_column(headers, data):
+    """Add a 'Location' column joining City/State/Country when present."""
+    idx = {h: i for i, h in enumerate(headers)}
+    location_indices = [idx[col] for col in ('City', 'State', 'Country') if col in idx]
+    if not location_indices:
+        return
+    if 'Location' not in idx:
+        headers.append('Location')
+        idx['Location'] = len(headers) - 1
+        for row in data:
+            row.append('')
+    loc_idx = idx['Location']
+    for row in data:
+        parts = []
+        for col_idx in location_indices:
+            value = row[col_idx].strip()
+            if value not in EMPTY_SENTINELS:
+                parts.append(value)
+        row[loc_idx] = ', '.join(parts)
+
+
+def clean_csv_data(filepath, cleaning_options, col_index=None):
+    """Clean the CSV at ``filepath`` in one streaming pass.
+
+    All selected cleaning steps (trim, drop missing names, title-case,
+    email lowering, phone normalisation, dedup and column filtering) are
+    applied row by row, so peak memory stays constant apart from the
+    dedup sets.
+
+    Returns ``(cleaned_headers, cleaned_rows)`` where ``cleaned_rows`` is
+    a generator yielding cleaned rows lazily; the caller decides where
+    they go (file, preview, or both).
+
+    ``col_index`` is the header-to-index map computed at upload time; it
+    is rebuilt here only when the caller cannot supply it.
+    """
+    # The upload step leaves a pickled copy of the parsed rows next to the
+    # CSV; loading it skips the whole parse plus encoding detection.
+    cache_path = filepath + '.pkl'
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            headers, rows = pickle.load(f)
+    else:
+        headers, rows = read_csv_file(filepath)
+
+    if col_index is None:
+        col_index = {h: i for i, h in enumerate(headers)}
+    email_idx = col_index.get('Email')
+    phone_idx = col_index.get('Phone Number')
+
+    plan = _compile_plan(cleaning_options, col_index, len(headers))
+    do_dedup_email = 'remove_email_duplicates' in cleaning_options and email_idx is not None
+    do_dedup_phone = 'remove_phone_duplicates' in cleaning_options and phone_idx is not None
+
+    if 'filter_columns' in cleaning_options:
+        allowed_indices = [i for i, col in enumerate(headers) if col in ALLOWED_COLUMNS]
+    else:
+        allowed_indices = list(range(len(headers)))
+    cleaned_headers = [headers[i] for i in allowed_indices]
+
+    def finalize(transformed):
+        # Dedup needs shared state, so it always runs serially over the
+        # transformed rows. Keys map to the first row number seen, making
+        # membership test and insert a single setdefault (one hash).
+        seen_emails = {}
+        seen_phones = {}
+        for row_num, row in enumerate(transformed):
+            if do_dedup_email:
+                key = row[email_idx].strip().lower()
+                if key not in EMPTY_SENTINELS_LC and seen_emails.setdefault(key, row_num) != row_num:
+                    continue
+
+            if do_dedup_phone:
+                key = row[phone_idx].strip()
+                if key not in EMPTY_SENTINELS and seen_phones.setdefault(key, row_num) != row_num:
+                    continue
+
+            yield [row[i] for i in allowed_indices]
+
+    if isinstance(rows, list) and len(rows) > PARALLEL_MIN_ROWS:
+        # The row-local transforms are embarrassingly parallel: fan chunks
+        # out to a pool and stream them back in order so dedup stays
+        # deterministic (first occurrence wins).
+        def transformed():
+            with Pool(os.cpu_count(), initializer=_init_worker, initargs=(plan,)) as pool:
+                yield from itertools.chain.from_iterable(
+                    pool.imap(_clean_chunk, _chunk_iter(rows, _PARALLEL_CHUNK_ROWS)))
+
+        return cleaned_headers, finalize(transformed())
+
+    serial = (out for out in (_transform_row(row, plan) for row in rows)
+              if out is not None)
+    return cleaned_headers, finalize(serial)
+
+
+@app.route('/', methods=['GET', 'POST'])
+def index():
+    cleanup_old_files()
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if file is None or file.filename == '':
+            return render_template('index.html', error='Please select a CSV file to upload.')
+        if not file.filename.lower().endswith('.csv'):
+            return render_template('index.html', error='Only CSV files are supported.')
+
+        session_id = str(uuid.uuid4())
+        session['session_id'] = session_id
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], session_id + '.csv')
+        file.save(filepath)
+
+        try:
+            headers, rows = read_csv_file(filepath)
+            data = [row for row in rows]
+        except UnicodeDecodeError:
+            # The UTF-8 fast path decodes lazily, so an invalid byte past
+            # the first decode buffer only surfaces here while draining
+            # the rows; retry with the single-byte fallback encodings,
+            # which decode any input. This clause must precede the
+            # ValueError one: UnicodeDecodeError subclasses ValueError.
+            try:
+                headers, rows = _read_csv_fallback(
+                    filepath, encodings=('latin-1', 'cp1252', 'iso-8859-1'))
+                data = [row for row in rows]
+            except ValueError as exc:
+                return render_template('index.html', error=str(exc))
+        except ValueError as exc:
+            return render_template('index.html', error=str(exc))
+
+        # Normalise ragged rows to the header width once, so the cleaning
+        # helpers never need per-row padding checks.
+        width = len(headers)
+        data = [row + [''] * (width - len(row)) if len(row) < width else row[:width]
+                for row in data]
+
+        create_phone_number_column(headers, data)
+        create_location_column(headers, data)
+
+        # Persist the derived columns so the cleaning pass sees them too,
+        # and pickle the parsed rows so /clean never re-parses the CSV.
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(data)
+        with open(filepath + '.pkl', 'wb') as f:
+            pickle.dump((headers, data), f, protocol=5)
+
+        session['current_file'] = filepath
+        # Column metadata computed once here so /clean never rescans headers.
+        session['col_index'] = {h: i for i, h in enumerate(headers)}
+        return render_template('index.html', columns=headers, preview=data[:10],
+                               row_count=len(data))
+
+    return render_template('index.html')
+
+
+@app.route('/clean', methods=['POST'])
+def clean_data():
+    filepath = session.get('current_file')
+    if not filepath or not os.path.exists(filepath):
+        return render_template('index.html', error='Please upload a CSV file first.')
+
+    cleaning_options = request.form.getlist('cleaning_options')
+    cleaned_filepath = os.path.join(app.config['UPLOAD_FOLDER'],
+                                    'cleaned_' + os.path.basename(filepath))
+
+    cleaned_headers, cleaned_rows = clean_csv_data(filepath, cleaning_options,
+                                                   col_index=session.get('col_index'))
+
+    # Finish (or cancel, if still queued) this session's previous writer
+    # so two writers never target the same output and its worker slot is
+    # free for the new job.
+    session_id = session.get('session_id')
+    previous = _clean_futures.pop(session_id, None)
+    if previous is not None and not previous.cancel():
+        try:
+            previous.result()
+        except Exception:
+            # Its output is about to be replaced; errors no longer matter.
+            pass
+
+    # Drain the generator to the output file in a background thread,
+    # handing the first ten rows to this request thread through a queue so
+    # the preview renders without waiting for the full file. Each clean
+    # writes its own temp file and renames it into place on success, so a
+    # half-written output is never visible under the final name.
+    preview_queue = queue.Queue()
+    tmp_filepath = cleaned_filepath + '.' + uuid.uuid4().hex + '.tmp'
+
+    def write_output():
+        handed_over = 0
+        try:
+            with open(tmp_filepath, 'w', encoding='utf-8', newline='') as out:
+                writer = csv.writer(out)
+                writer.writerow(cleaned_headers)
+                for row in cleaned_rows:
+                    writer.writerow(row)
+                    if handed_over < 10:
+                        preview_queue.put(row)
+                        handed_over += 1
+            os.replace(tmp_filepath, cleaned_filepath)
+        finally:
+            preview_queue.put(None)
+
+    _clean_futures[session_id] = _clean_executor.submit(write_output)
+
+    preview_rows = []
+    while len(preview_rows) < 10:
+        try:
+            row = preview_queue.get(timeout=30)
+        except queue.Empty:
+            # The writer is still queued behind other sessions' jobs;
+            # render without a preview rather than hold the request open.
+            break
+        if row is None:
+            break
+        preview_rows.append(row)
+
+    session['cleaned_file'] = cleaned_filepath
+    return render_template('index.html', columns=cleaned_headers, preview=preview_rows,
+                           download_ready=True)
+
+
+@app.route('/download')
+def download_csv():
+    cleaned_filepath = session.get('cleaned_file')
+    if not cleaned_filepath:
+        return render_template('index.html', error='No cleaned file available for download.')
+    # Wait for the background writer (and surface any error it hit).
+    future = _clean_futures.pop(session.get('session_id'), None)
+    if future is not None:
+        future.result()
+    if not os.path.exists(cleaned_filepath):
+        return render_template('index.html', error='No cleaned file available for download.')
+    return send_file(cleaned_filepath, as_attachment=True,
+                     download_name='cleaned_data.csv', mimetype='text/csv')
+
+
+if __name__ == '__main__':
+    app.run(debug=True)